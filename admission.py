@@ -0,0 +1,138 @@
+import os, threading, time
+from typing import Optional, Dict
+
+# Route classes, highest priority first. Purchases are revenue-critical, so
+# staff classes shed load while purchases are queueing. Search is how customers
+# reach a purchase, so it never yields by default.
+ROUTE_CLASSES = ("purchase", "search", "admin", "staff-analytics")
+
+# limit, queue, wait (seconds), retry_after (seconds),
+# yield_at (shed while >= this many purchases are queued; 0 = never yield)
+DEFAULTS = {
+    "purchase":        (8, 32, 5.0, 1,  0),
+    "search":          (6, 12, 1.0, 2,  0),
+    "admin":           (2, 4,  2.0, 5,  4),
+    "staff-analytics": (2, 2,  0.5, 30, 1),
+}
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed instead of admitted."""
+
+    def __init__(self, route_class: str, retry_after: int):
+        super().__init__(route_class)
+        self.route_class = route_class
+        self.retry_after = retry_after
+
+
+class Gate:
+    """Concurrency limit with a bounded FIFO-ish wait queue for one route class."""
+
+    def __init__(self, name: str, limit: int, queue: int, wait: float, retry_after: int,
+                 yield_at: int = 0):
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue = max(0, queue)
+        self.wait = wait
+        self.retry_after = retry_after
+        self.yield_at = max(0, yield_at)
+        self.cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.shed = 0
+
+    def acquire(self, yield_to: Optional["Gate"] = None):
+        with self.cond:
+            # lower-priority classes give way once enough purchases are queueing
+            if yield_to is not None and self.yield_at and yield_to.waiting >= self.yield_at:
+                self.shed += 1
+                raise Overloaded(self.name, self.retry_after)
+            if self.active < self.limit and self.waiting == 0:
+                self.active += 1
+                self.admitted += 1
+                return
+            if self.waiting >= self.queue:
+                self.rejected += 1
+                raise Overloaded(self.name, self.retry_after)
+            self.waiting += 1
+            deadline = time.monotonic() + self.wait
+            try:
+                while self.active >= self.limit:
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        self.timed_out += 1
+                        raise Overloaded(self.name, self.retry_after)
+                    self.cond.wait(left)
+            finally:
+                self.waiting -= 1
+            self.active += 1
+            self.admitted += 1
+
+    def release(self):
+        with self.cond:
+            self.active -= 1
+            self.cond.notify()
+
+    def stats(self) -> Dict[str, float]:
+        with self.cond:
+            return {
+                "limit": self.limit,
+                "queue_limit": self.queue,
+                "yield_at": self.yield_at,
+                "active": self.active,
+                "queue_depth": self.waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "shed": self.shed,
+            }
+
+
+def _env_key(route_class: str, field: str) -> str:
+    return "ADMIT_{}_{}".format(route_class.replace("-", "_").upper(), field)
+
+
+def load_gates() -> Dict[str, Gate]:
+    """Build one Gate per route class; each knob can be overridden via env,
+    e.g. ADMIT_STAFF_ANALYTICS_LIMIT=1 or ADMIT_SEARCH_YIELD_AT=16."""
+    gates = {}
+    for name in ROUTE_CLASSES:
+        limit, queue, wait, retry_after, yield_at = DEFAULTS[name]
+        gates[name] = Gate(
+            name,
+            limit=int(os.getenv(_env_key(name, "LIMIT"), limit)),
+            queue=int(os.getenv(_env_key(name, "QUEUE"), queue)),
+            wait=float(os.getenv(_env_key(name, "WAIT"), wait)),
+            retry_after=int(os.getenv(_env_key(name, "RETRY_AFTER"), retry_after)),
+            yield_at=int(os.getenv(_env_key(name, "YIELD_AT"), yield_at)),
+        )
+    return gates
+
+
+gates = load_gates()
+
+
+class admit:
+    """Context manager: hold a slot in `route_class` for the duration of the block.
+
+    Raises Overloaded when the class is saturated, or when it is configured to
+    yield and purchases are queueing."""
+
+    def __init__(self, route_class: str):
+        self.gate = gates[route_class]
+
+    def __enter__(self):
+        yield_to = None if self.gate.name == "purchase" else gates["purchase"]
+        self.gate.acquire(yield_to=yield_to)
+        return self.gate
+
+    def __exit__(self, *exc):
+        self.gate.release()
+        return False
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    return {name: gate.stats() for name, gate in gates.items()}
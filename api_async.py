@@ -0,0 +1,187 @@
+import os, json, asyncio
+from typing import List, Sequence
+import aiomysql
+from aiohttp import web
+from dotenv import load_dotenv
+from queries import (
+    build_staff_query, build_search_query,
+    FLIGHT_STATUS_SQL, RATINGS_SUMMARY_SQL, RATINGS_COMMENTS_SQL,
+)
+
+# Read-only JSON API (flight search / status / schedules / ratings) on asyncio.
+# Runs as its own process next to app.py:  python api_async.py
+# It keeps a separate aiomysql pool, so idle-waiting clients cost a coroutine,
+# not a worker thread, and independent queries run concurrently.
+#
+# This process does NOT share admission state with app.py: it cannot see the
+# purchase queue. Its database share is bounded instead by the pool size
+# (ASYNC_POOL_MAX), and requests that can't get a connection within
+# ASYNC_ACQUIRE_TIMEOUT fail fast with 503 + Retry-After. The airline
+# schedule/ratings endpoints run the same history scans app.py classes as
+# staff-analytics, so they share a small separate slot count
+# (ASYNC_ANALYTICS_LIMIT) and get 503 immediately when it is used up.
+
+load_dotenv()
+
+MAX_DATES = 14  # cap on multi-date fan-out per request
+ACQUIRE_TIMEOUT = float(os.getenv("ASYNC_ACQUIRE_TIMEOUT", "1.0"))
+RETRY_AFTER = int(os.getenv("ASYNC_RETRY_AFTER", "2"))
+ANALYTICS_LIMIT = int(os.getenv("ASYNC_ANALYTICS_LIMIT", "2"))
+ANALYTICS_RETRY_AFTER = int(os.getenv("ASYNC_ANALYTICS_RETRY_AFTER", "30"))
+
+POOL = web.AppKey("pool", aiomysql.Pool)
+ANALYTICS = web.AppKey("analytics", asyncio.Semaphore)
+
+class Busy(Exception):
+    """Raised instead of waiting; answered with 503 + Retry-After."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+async def init_pool(app):
+    app[POOL] = await aiomysql.create_pool(
+        host=os.getenv("MYSQL_HOST", "localhost"),
+        port=int(os.getenv("MYSQL_PORT", "8889")),
+        user=os.getenv("MYSQL_USER", "root"),
+        password=os.getenv("MYSQL_PASSWORD", "root"),
+        db=os.getenv("MYSQL_DB", "Airline Ticket Reservation System"),
+        charset="utf8mb4",
+        cursorclass=aiomysql.DictCursor,
+        autocommit=True,
+        minsize=int(os.getenv("ASYNC_POOL_MIN", "2")),
+        maxsize=int(os.getenv("ASYNC_POOL_MAX", "10")),
+    )
+
+async def close_pool(app):
+    app[POOL].close()
+    await app[POOL].wait_closed()
+
+async def fetchall(pool, sql: str, params: Sequence) -> List[dict]:
+    # one connection per query: a MySQL connection can't run two statements at once
+    try:
+        c = await asyncio.wait_for(pool.acquire(), ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise Busy(RETRY_AFTER)
+    try:
+        async with c.cursor() as cur:
+            await cur.execute(sql, tuple(params))
+            return list(await cur.fetchall())
+    finally:
+        pool.release(c)
+
+def as_json(data, status: int = 200):
+    # default=str covers DATETIME and DECIMAL columns
+    return web.json_response(data, status=status, dumps=lambda o: json.dumps(o, default=str))
+
+def split_dates(raw: List[str]) -> List[str]:
+    dates = []
+    for item in raw:
+        for d in item.split(","):
+            d = d.strip()
+            if d and d not in dates:
+                dates.append(d)
+    return dates
+
+def analytics_slot(request) -> asyncio.Semaphore:
+    # fail fast instead of queueing behind other history scans
+    sem = request.app[ANALYTICS]
+    if sem.locked():
+        raise Busy(ANALYTICS_RETRY_AFTER)
+    return sem
+
+@web.middleware
+async def shed_busy(request, handler):
+    try:
+        return await handler(request)
+    except Busy as e:
+        resp = as_json({"error": "Server busy, please retry shortly."}, 503)
+        resp.headers["Retry-After"] = str(e.retry_after)
+        return resp
+
+# ---------------- routes ----------------
+routes = web.RouteTableDef()
+
+@routes.get("/api/flights/search")
+async def api_search(request):
+    q = request.query
+    dep = q.get("depart", "").upper().strip()
+    arr = q.get("arrive", "").upper().strip()
+    dates = split_dates(q.getall("date", []))  # ?date=a&date=b or ?date=a,b
+    if len(dates) > MAX_DATES:
+        return as_json({"error": f"at most {MAX_DATES} dates per request"}, 400)
+    pool = request.app[POOL]
+    if not dates:
+        sql, args = build_search_query(dep, arr, "")
+        return as_json({"flights": await fetchall(pool, sql, args)})
+
+    queries = [build_search_query(dep, arr, d) for d in dates]
+    results = await asyncio.gather(*(fetchall(pool, sql, args) for sql, args in queries))
+    return as_json({"by_date": dict(zip(dates, results))})
+
+@routes.get("/api/flights/status")
+async def api_status(request):
+    q = request.query
+    keys = (
+        q.get("airline_name", "").strip(),
+        q.get("flight_number", "").strip(),
+        q.get("departure_date_time", "").strip(),
+    )
+    if not all(keys):
+        return as_json({"error": "airline_name, flight_number and departure_date_time required"}, 400)
+    rows = await fetchall(request.app[POOL], FLIGHT_STATUS_SQL, keys)
+    if not rows:
+        return as_json({"error": "Flight not found"}, 404)
+    return as_json(rows[0])
+
+@routes.get("/api/airlines/{airline}/flights")
+async def api_airline_flights(request):
+    q = request.query
+    sql, params = build_staff_query(
+        request.match_info["airline"],
+        q.get("period"), q.get("start_date"), q.get("end_date"),
+        q.get("from_airport"), q.get("to_airport"),
+        q.get("from_city"), q.get("to_city"),
+    )
+    async with analytics_slot(request):
+        rows = await fetchall(request.app[POOL], sql, params)
+    return as_json({"flights": rows})
+
+@routes.get("/api/airlines/{airline}/ratings")
+async def api_airline_ratings(request):
+    airline = request.match_info["airline"]
+    pool = request.app[POOL]
+    async with analytics_slot(request):
+        summary, comments = await asyncio.gather(
+            fetchall(pool, RATINGS_SUMMARY_SQL, (airline,)),
+            fetchall(pool, RATINGS_COMMENTS_SQL, (airline,)),
+        )
+    # public surface: don't leak reviewer emails
+    for c in comments:
+        c.pop("customer_email", None)
+    return as_json({"summary": summary, "comments": comments})
+
+@routes.get("/api/health")
+async def api_health(request):
+    try:
+        await fetchall(request.app[POOL], "SELECT 1", ())
+        return as_json({"ok": True})
+    except Busy:
+        raise
+    except Exception as e:
+        return as_json({"ok": False, "error": str(e)}, 500)
+
+def create_app(pool=None):
+    """`pool` lets tests pass a stub instead of connecting to MySQL."""
+    app = web.Application(middlewares=[shed_busy])
+    app.add_routes(routes)
+    app[ANALYTICS] = asyncio.Semaphore(ANALYTICS_LIMIT)
+    if pool is None:
+        app.on_startup.append(init_pool)
+        app.on_cleanup.append(close_pool)
+    else:
+        app[POOL] = pool
+    return app
+
+if __name__ == "__main__":
+    web.run_app(create_app(), port=int(os.getenv("API_PORT", "8080")))
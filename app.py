@@ -1,9 +1,16 @@
-import os, hashlib
+import os, hashlib, threading
+from functools import wraps
 from flask import Flask, render_template, request, redirect, url_for, session, flash
 import pymysql.cursors
 from pymysql.cursors import DictCursor
 from dotenv import load_dotenv
 from typing import Optional, Tuple, List
+import admission
+from queries import (
+    build_staff_query, build_search_query, build_trips_query,
+    RATINGS_SUMMARY_SQL, RATINGS_COMMENTS_SQL,
+)
+from session_cache import trip_cache
 
 load_dotenv()
 
@@ -30,75 +37,92 @@ def as_customer():
 def as_staff():
     return session.get("role") == "staff"
 
-def build_staff_query(
-    airline: str,
-    period: str,
-    start_date: str,
-    end_date: str,
-    from_ap: str,
-    to_ap: str,
-    from_city: str,
-    to_city: str,
-):
-   
-    period = (period or "").strip().lower()
-    from_ap = (from_ap or "").strip().upper()
-    to_ap   = (to_ap or "").strip().upper()
-    from_city = (from_city or "").strip()
-    to_city   = (to_city or "").strip()
-    start_date = (start_date or "").strip()
-    end_date   = (end_date or "").strip()
-
-    where = ["f.airline_name = %s"]
-    params = [airline]
-
-    if start_date and end_date:
-        if end_date < start_date:
-            start_date, end_date = end_date, start_date
-        where.append("f.departure_date_time >= %s")
-        where.append("f.departure_date_time < DATE_ADD(%s, INTERVAL 1 DAY)")
-        params.extend([start_date, end_date])
-    else:
-        if period == "current":
-            where.append("DATE(f.departure_date_time) = CURRENT_DATE")
-        elif period == "future":
-            where.append("f.departure_date_time >= CURRENT_TIMESTAMP")
-        elif period == "past":
-            where.append("f.departure_date_time < CURRENT_TIMESTAMP")
-        else:
-            where.append("f.departure_date_time >= CURRENT_DATE")
-            where.append("f.departure_date_time < DATE_ADD(CURRENT_DATE, INTERVAL 30 DAY)")
-
-    if from_ap:
-        where.append("f.departure_airport = %s")
-        params.append(from_ap)
-
-    if to_ap:
-        where.append("f.arrival_airport = %s")
-        params.append(to_ap)
-
-    if from_city:
-        where.append("da.city LIKE %s")
-        params.append(f"%{from_city}%")
-
-    if to_city:
-        where.append("aa.city LIKE %s")
-        params.append(f"%{to_city}%")
-
-    sql = """
-    SELECT f.flight_number,
-           f.departure_date_time, f.arrival_date_time,
-           f.departure_airport,   f.arrival_airport,
-           f.status
-    FROM Flight f
-    JOIN Airport da ON da.code = f.departure_airport
-    JOIN Airport aa ON aa.code = f.arrival_airport
-    WHERE {where}
-    ORDER BY f.departure_date_time
-    """.format(where=" AND ".join(where))
-
-    return sql, params
-    
+# `conn` is one PyMySQL connection with autocommit off: it is not thread-safe,
+# and a view's statements and its commit() must not interleave with another
+# request's. Every view that touches the DB holds db_lock for its duration, so
+# the admission limits bound how many requests wait for the connection, not
+# how many run SQL at once.
+db_lock = threading.Lock()
+
+def serialized(view):
+    """Hold db_lock for the whole view (for views outside admission control)."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with db_lock:
+            return view(*args, **kwargs)
+    return wrapper
+
+def admitted(route_class, role: Optional[str] = None):
+    """Run the view inside an admission slot for `route_class` (a name, or a
+    callable returning one from the current request; None skips admission for
+    requests that don't touch the DB). With `role`, the login check runs first
+    so anonymous requests never hold a slot."""
+    def deco(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if role and session.get("role") != role:
+                return redirect(url_for("login"))
+            name = route_class() if callable(route_class) else route_class
+            if name is None:
+                return view(*args, **kwargs)
+            with admission.admit(name), db_lock:
+                return view(*args, **kwargs)
+        return wrapper
+    return deco
+
+TRIPS_PER_PAGE = int(os.getenv("TRIPS_PER_PAGE", "20"))
+
+def customer_trips(email: str, view: str, after: Optional[Tuple] = None):
+    """One page of upcoming/past trips as (rows, has_more). `after` is the
+    previous page's last (departure_date_time, airline_name, flight_number,
+    ticket_ID). Only first pages are cached; deeper pages go to the database."""
+    if after is None:
+        hit = trip_cache.get(email, view)
+        if hit is not None:
+            return hit
+        token = trip_cache.token()
+    with conn.cursor() as cur:
+        cur.execute(
+            build_trips_query(view, after is not None),
+            (email, *((after[0],) + after if after else ()), TRIPS_PER_PAGE + 1),
+        )
+        rows = cur.fetchall()
+    result = (rows[:TRIPS_PER_PAGE], len(rows) > TRIPS_PER_PAGE)
+    if after is None:
+        trip_cache.put(email, view, result, token)
+    return result
+
+def trips_cursor(args) -> Optional[Tuple]:
+    """Keyset cursor from ?after_dt=&after_airline=&after_flight=&after_ticket=."""
+    cursor = (
+        args.get("after_dt", "").strip(),
+        args.get("after_airline", "").strip(),
+        args.get("after_flight", "").strip(),
+        args.get("after_ticket", "").strip(),
+    )
+    if not all(cursor) or not cursor[3].isdigit():
+        return None
+    return cursor[:3] + (int(cursor[3]),)
+
+def search_class():
+    # GET only renders the empty form
+    return "search" if request.method == "POST" else None
+
+def staff_home_class():
+    # past periods and explicit ranges scan history; the default window is cheap
+    if (request.args.get("period") or "").strip().lower() == "past":
+        return "staff-analytics"
+    if request.args.get("start_date") and request.args.get("end_date"):
+        return "staff-analytics"
+    return "admin"
+
+@app.errorhandler(admission.Overloaded)
+def overloaded(e):
+    return (
+        "Server busy, please retry shortly.",
+        503,
+        {"Retry-After": str(e.retry_after), "Content-Type": "text/plain; charset=utf-8"},
+    )
 
 # ---------------- public home & search ----------------
 @app.get("/")
@@ -106,25 +130,14 @@ def index():
     return render_template("index.html")
 
 @app.route("/search", methods=["GET", "POST"])
+@admitted(search_class)
 def public_search():
     if request.method == "GET":
         return render_template("customer_search.html", rows=[])
     dep = request.form.get("depart", "").upper().strip()
     arr = request.form.get("arrive", "").upper().strip()
     date = request.form.get("date", "").strip()  # YYYY-MM-DD
-    sql = (
-        "SELECT airline_name, flight_number, departure_date_time, arrival_date_time, base_price, "
-        "departure_airport, arrival_airport, status "
-        "FROM Flight WHERE departure_date_time >= NOW()"
-    )
-    args = []
-    if dep:
-        sql += " AND departure_airport=%s"; args.append(dep)
-    if arr:
-        sql += " AND arrival_airport=%s"; args.append(arr)
-    if date:
-        sql += " AND DATE(departure_date_time)=%s"; args.append(date)
-    sql += " ORDER BY departure_date_time"
+    sql, args = build_search_query(dep, arr, date)
     with conn.cursor() as cur:
         cur.execute(sql, tuple(args))
         rows = cur.fetchall()
@@ -132,6 +145,7 @@ def public_search():
 
 # ---------------- registration ----------------
 @app.route("/register/customer", methods=["GET", "POST"])
+@serialized
 def register_customer():
     if request.method == "GET":
         return render_template("register_customer.html")
@@ -156,6 +170,7 @@ def register_customer():
     return redirect(url_for("login"))
 
 @app.route("/register/staff", methods=["GET", "POST"])
+@serialized
 def register_staff():
     if request.method == "GET":
         return render_template("register_staff.html")
@@ -185,6 +200,7 @@ def register_staff():
 
 # ---------------- login/logout ----------------
 @app.route("/login", methods=["GET", "POST"])
+@serialized
 def login():
     if request.method == "GET":
         return render_template("login.html")
@@ -201,6 +217,7 @@ def login():
             flash("Invalid credentials")
             return redirect(url_for("login"))
         
+        trip_cache.invalidate(row["email"])
         session.update({"role":"customer", "email": row["email"], "display": row.get("name") or row["email"]})
         return redirect(url_for("customer_home"))
     
@@ -227,56 +244,47 @@ def login():
 
 @app.get("/logout")
 def logout():
+    if as_customer():
+        trip_cache.invalidate(session["email"])
     session.clear()
     return redirect(url_for("index"))
 
 # ---------------- customer use cases ----------------
 @app.get("/customer")
+@serialized
 def customer_home():
     if not as_customer():
         return redirect(url_for("login"))
-    email = session["email"]
-    with conn.cursor() as cur:
-        cur.execute(
-            """
-            SELECT t.ticket_ID, f.airline_name, f.flight_number, f.departure_date_time,
-                   f.departure_airport, f.arrival_airport, f.arrival_date_time, f.status
-            FROM Ticket t JOIN Flight f
-            ON t.airline_name=f.airline_name AND t.flight_number=f.flight_number AND t.departure_date_time=f.departure_date_time
-            WHERE t.customer_email=%s AND f.departure_date_time >= NOW()
-            ORDER BY f.departure_date_time
-            """,
-            (email,),
-        )
-        flights = cur.fetchall()
-    return render_template("customer_home.html", name=session["display"], flights=flights)
+    flights, has_more = customer_trips(session["email"], "upcoming")
+    return render_template("customer_home.html", name=session["display"], flights=flights, has_more=has_more)
+
+@app.get("/customer/trips")
+@serialized
+def customer_trips_page():
+    if not as_customer():
+        return redirect(url_for("login"))
+    view = "past" if request.args.get("view") == "past" else "upcoming"
+    after = trips_cursor(request.args)
+    trips, has_more = customer_trips(session["email"], view, after)
+    return render_template("customer_trips.html", trips=trips, view=view, first=after is None, has_more=has_more)
 
 @app.route("/customer/search", methods=["GET", "POST"])
+@admitted(search_class)
 def customer_search():
     if request.method == "GET":
         return render_template("customer_search.html", rows=[])
     dep = request.form.get("depart", "").upper().strip()
     arr = request.form.get("arrive", "").upper().strip()
     date = request.form.get("date", "").strip()
-    sql = (
-        "SELECT airline_name, flight_number, departure_date_time, arrival_date_time, base_price, departure_airport, arrival_airport, status "
-        "FROM Flight WHERE departure_date_time >= NOW()"
-    )
-    args = []
-    if dep: sql += " AND departure_airport=%s"; args.append(dep)
-    if arr: sql += " AND arrival_airport=%s"; args.append(arr)
-    if date: sql += " AND DATE(departure_date_time)=%s"; args.append(date)
-    sql += " ORDER BY departure_date_time"
+    sql, args = build_search_query(dep, arr, date)
     with conn.cursor() as cur:
         cur.execute(sql, tuple(args))
         rows = cur.fetchall()
     return render_template("customer_search.html", rows=rows, dep=dep, arr=arr, date=date)
 
 @app.post("/customer/purchase")
+@admitted("purchase", role="customer")
 def customer_purchase():
-    if not as_customer():
-        return redirect(url_for("login"))
-
     email   = session["email"]
     airline = request.form.get("airline_name", "").strip()
     flight  = request.form.get("flight_number", "").strip()
@@ -349,10 +357,12 @@ def customer_purchase():
         )
 
     conn.commit()
+    trip_cache.invalidate(email)
     flash(f"Ticket purchased (#{next_id})")
     return redirect(url_for("customer_home"))
 
 @app.get("/customer/reviews")
+@serialized
 def customer_reviews():
     if not as_customer():
         return redirect(url_for("login"))
@@ -366,6 +376,7 @@ def customer_reviews():
     return render_template("customer_reviews.html", rows=rows)
 
 @app.post("/customer/review")
+@serialized
 def save_review():
     if not as_customer():
         return redirect(url_for("login"))
@@ -390,10 +401,12 @@ def save_review():
             (email, airline, flight, dep_dt, rating, comment),
         )
     conn.commit()
+    trip_cache.invalidate(email)
     flash("Review saved")
     return redirect(url_for("customer_reviews"))
 
 @app.post("/customer/review/delete")
+@serialized
 def delete_review():
     if not as_customer():
         return redirect(url_for("login"))
@@ -403,15 +416,14 @@ def delete_review():
             (session["email"], request.form.get("airline_name"), request.form.get("flight_number"), request.form.get("departure_date_time")),
         )
     conn.commit()
+    trip_cache.invalidate(session["email"])
     flash("Review deleted")
     return redirect(url_for("customer_reviews"))
 
 # ---------------- staff use cases ----------------
 @app.get("/staff")
+@admitted(staff_home_class, role="staff")
 def staff_home():
-    if session.get("role") != "staff":
-        return redirect(url_for("login"))
-
     airline = session.get("airline")
 
     period      = request.args.get("period")         # current|future|past|range|None
@@ -446,10 +458,8 @@ def staff_home():
     )
 
 @app.get("/staff/customers")
+@admitted("admin", role="staff")
 def staff_customers():
-    if session.get("role") != "staff":
-        return redirect(url_for("login"))
-
     airline = session.get("airline")
     flight  = request.args.get("flight_number")
     dep_dt  = request.args.get("departure_date_time")
@@ -480,10 +490,8 @@ def staff_customers():
     )
 
 @app.route("/staff/create-flight", methods=["GET", "POST"])
+@admitted("admin", role="staff")
 def staff_create_flight():
-    if not as_staff():
-        return redirect(url_for("login"))
-
     airline = session["airline"]
 
     if request.method == "GET":
@@ -538,9 +546,8 @@ def staff_create_flight():
 
 
 @app.route("/staff/change-status", methods=["GET", "POST"])
+@admitted("admin", role="staff")
 def staff_change_status():
-    if not as_staff():
-        return redirect(url_for("login"))
     if request.method == "GET":
         return render_template("staff_change_status.html")
     airline = session["airline"]
@@ -560,10 +567,8 @@ def staff_change_status():
     return redirect(url_for("staff_home"))
 
 @app.route("/staff/add-airplane", methods=["GET", "POST"])
+@admitted("admin", role="staff")
 def staff_add_airplane():
-    if not as_staff():
-        return redirect(url_for("login"))
-
     airline = session["airline"]
 
     if request.method == "GET":
@@ -604,39 +609,19 @@ def staff_add_airplane():
 
 
 @app.get("/staff/ratings")
-
+@admitted("staff-analytics", role="staff")
 def staff_ratings():
-    if not as_staff():
-        return redirect(url_for("login"))
     airline = session["airline"]
     with conn.cursor() as cur:
-        cur.execute(
-            """
-            SELECT f.airline_name, f.flight_number, f.departure_date_time,
-                   AVG(r.rating) AS avg_rating, COUNT(*) AS cnt
-            FROM Flight f LEFT JOIN Review r
-              ON f.airline_name=r.airline_name AND f.flight_number=r.flight_number AND f.departure_date_time=r.departure_date_time
-            WHERE f.airline_name=%s
-            GROUP BY f.airline_name, f.flight_number, f.departure_date_time
-            ORDER BY f.flight_number, f.departure_date_time
-            """,
-            (airline,),
-        )
+        cur.execute(RATINGS_SUMMARY_SQL, (airline,))
         summary = cur.fetchall()
-        cur.execute(
-            """
-            SELECT r.customer_email, r.airline_name, r.flight_number, r.departure_date_time, r.rating, r.comment, r.created_at
-            FROM Review r WHERE r.airline_name=%s ORDER BY r.created_at DESC
-            """,
-            (airline,),
-        )
+        cur.execute(RATINGS_COMMENTS_SQL, (airline,))
         comments = cur.fetchall()
     return render_template("staff_view_ratings.html", summary=summary, comments=comments)
 
 @app.route("/staff/reports", methods=["GET", "POST"])
+@admitted("staff-analytics", role="staff")
 def staff_reports():
-    if not as_staff():
-        return redirect(url_for("login"))
     airline = session["airline"]
     rows = None
     if request.method == "POST":
@@ -689,6 +674,7 @@ def staff_reports():
 
 # health
 @app.get("/health")
+@serialized
 def health():
     try:
         with conn.cursor() as cur:
@@ -697,6 +683,10 @@ def health():
     except Exception as e:
         return {"ok": False, "error": str(e)}, 500
 
+@app.get("/health/admission")
+def admission_stats():
+    return admission.stats()
+
 if __name__ == "__main__":
     app.run(debug=bool(int(os.getenv("FLASK_DEBUG", "1"))))
 
@@ -0,0 +1,105 @@
+import os, sys, time, asyncio, argparse
+from typing import List
+import aiohttp
+
+# Concurrency benchmark: sync Flask search (POST /search, HTML) vs the async
+# JSON API (GET /api/flights/search). Both sides shed load with 503 by design
+# (app.py's "search" admission gate, api_async's pool acquire timeout), so
+# start them with shedding relaxed to measure the servers themselves:
+#   ADMIT_SEARCH_LIMIT=100000 ADMIT_SEARCH_QUEUE=100000 python app.py        (:5000)
+#   ASYNC_ACQUIRE_TIMEOUT=60 python api_async.py                              (:8080)
+# then:
+#   python bench_search.py --levels 10,100,500,1000,2000 --depart JFK
+#
+# For every concurrency level, N clients fire requests back-to-back for
+# --seconds. Only 200 counts as ok. 503s go in their own "shed" column and
+# are not errors. Any other status (400 from a bad --date, 302, 404, 5xx) goes
+# in "bad" and, with timeouts and connection errors, counts as an error.
+# "ceiling" is the highest level that keeps the error rate under --max-errors.
+#
+# Not a like-for-like comparison: app.py runs every request on ONE PyMySQL
+# connection serialized by db_lock, so the sync ceiling is that of a single
+# DB connection behind Flask's threaded server. The async side uses a pool of
+# ASYNC_POOL_MAX connections.
+
+def pct(values: List[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+async def client(session, target, args, deadline, lat, errs, shed, bad):
+    while time.monotonic() < deadline:
+        t0 = time.monotonic()
+        try:
+            if target == "sync":
+                req = session.post(args.sync_url + "/search",
+                                   data={"depart": args.depart, "arrive": args.arrive, "date": args.date})
+            else:
+                req = session.get(args.async_url + "/api/flights/search",
+                                  params={"depart": args.depart, "arrive": args.arrive, "date": args.date})
+            async with req as r:
+                await r.read()
+                if r.status == 503:
+                    shed.append(time.monotonic() - t0)
+                    continue
+                if r.status != 200:
+                    bad.append(r.status)
+                    continue
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            errs.append("conn")
+            continue
+        lat.append(time.monotonic() - t0)
+
+async def run_level(target, n, args):
+    lat, errs, shed, bad = [], [], [], []
+    conn = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(connector=conn, timeout=timeout) as session:
+        deadline = time.monotonic() + args.seconds
+        await asyncio.gather(*(client(session, target, args, deadline, lat, errs, shed, bad) for _ in range(n)))
+    failed = len(errs) + len(bad)
+    total = len(lat) + failed
+    return {
+        "ok": len(lat),
+        "err": len(errs),
+        "bad": len(bad),
+        "shed": len(shed),
+        "err_rate": failed / total if total else 1.0,
+        "rps": len(lat) / args.seconds,
+        "p50_ms": pct(lat, 0.50) * 1000,
+        "p99_ms": pct(lat, 0.99) * 1000,
+    }
+
+async def main(args):
+    levels = [int(x) for x in args.levels.split(",")]
+    ceiling = {}
+    print(f"{'target':6} {'conc':>6} {'ok':>7} {'err':>6} {'bad':>6} {'shed':>6} {'rps':>8} {'p50ms':>8} {'p99ms':>8}")
+    for target in args.targets.split(","):
+        for n in levels:
+            s = await run_level(target, n, args)
+            print(f"{target:6} {n:6d} {s['ok']:7d} {s['err']:6d} {s['bad']:6d} {s['shed']:6d} {s['rps']:8.1f} {s['p50_ms']:8.1f} {s['p99_ms']:8.1f}")
+            sys.stdout.flush()
+            if s["err_rate"] <= args.max_errors:
+                ceiling[target] = n
+            else:
+                break
+    print()
+    for target in args.targets.split(","):
+        print(f"ceiling[{target}] = {ceiling.get(target, 0)} concurrent clients")
+    print("(non-zero shed means a 503 gate was active: relax it as described at the top of this file)")
+    print("(sync runs on a single serialized DB connection, async on a pool: not like-for-like)")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sync-url", default=os.getenv("SYNC_URL", "http://127.0.0.1:5000"))
+    ap.add_argument("--async-url", default=os.getenv("ASYNC_URL", "http://127.0.0.1:8080"))
+    ap.add_argument("--targets", default="sync,async")
+    ap.add_argument("--levels", default="10,50,100,500,1000,2000")
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--timeout", type=float, default=10.0)
+    ap.add_argument("--max-errors", type=float, default=0.01)
+    ap.add_argument("--depart", default="")
+    ap.add_argument("--arrive", default="")
+    ap.add_argument("--date", default="")
+    asyncio.run(main(ap.parse_args()))
@@ -0,0 +1,151 @@
+from typing import List, Tuple
+
+# SQL shared by the Flask app (app.py) and the async JSON API (api_async.py).
+# Everything here is driver-agnostic: %s placeholders work for PyMySQL and aiomysql.
+
+def build_search_query(dep: str, arr: str, date: str) -> Tuple[str, List[str]]:
+    sql = (
+        "SELECT airline_name, flight_number, departure_date_time, arrival_date_time, base_price, "
+        "departure_airport, arrival_airport, status "
+        "FROM Flight WHERE departure_date_time >= NOW()"
+    )
+    args = []
+    if dep:
+        sql += " AND departure_airport=%s"; args.append(dep)
+    if arr:
+        sql += " AND arrival_airport=%s"; args.append(arr)
+    if date:
+        sql += " AND DATE(departure_date_time)=%s"; args.append(date)
+    sql += " ORDER BY departure_date_time"
+    return sql, args
+
+FLIGHT_STATUS_SQL = """
+    SELECT airline_name, flight_number, departure_date_time, arrival_date_time,
+           departure_airport, arrival_airport, status
+    FROM Flight
+    WHERE airline_name=%s AND flight_number=%s AND departure_date_time=%s
+    LIMIT 1
+"""
+
+RATINGS_SUMMARY_SQL = """
+    SELECT f.airline_name, f.flight_number, f.departure_date_time,
+           AVG(r.rating) AS avg_rating, COUNT(*) AS cnt
+    FROM Flight f LEFT JOIN Review r
+      ON f.airline_name=r.airline_name AND f.flight_number=r.flight_number AND f.departure_date_time=r.departure_date_time
+    WHERE f.airline_name=%s
+    GROUP BY f.airline_name, f.flight_number, f.departure_date_time
+    ORDER BY f.flight_number, f.departure_date_time
+"""
+
+RATINGS_COMMENTS_SQL = """
+    SELECT r.customer_email, r.airline_name, r.flight_number, r.departure_date_time, r.rating, r.comment, r.created_at
+    FROM Review r WHERE r.airline_name=%s ORDER BY r.created_at DESC
+"""
+
+def build_staff_query(
+    airline: str,
+    period: str,
+    start_date: str,
+    end_date: str,
+    from_ap: str,
+    to_ap: str,
+    from_city: str,
+    to_city: str,
+):
+   
+    period = (period or "").strip().lower()
+    from_ap = (from_ap or "").strip().upper()
+    to_ap   = (to_ap or "").strip().upper()
+    from_city = (from_city or "").strip()
+    to_city   = (to_city or "").strip()
+    start_date = (start_date or "").strip()
+    end_date   = (end_date or "").strip()
+
+    where = ["f.airline_name = %s"]
+    params = [airline]
+
+    if start_date and end_date:
+        if end_date < start_date:
+            start_date, end_date = end_date, start_date
+        where.append("f.departure_date_time >= %s")
+        where.append("f.departure_date_time < DATE_ADD(%s, INTERVAL 1 DAY)")
+        params.extend([start_date, end_date])
+    else:
+        if period == "current":
+            where.append("DATE(f.departure_date_time) = CURRENT_DATE")
+        elif period == "future":
+            where.append("f.departure_date_time >= CURRENT_TIMESTAMP")
+        elif period == "past":
+            where.append("f.departure_date_time < CURRENT_TIMESTAMP")
+        else:
+            where.append("f.departure_date_time >= CURRENT_DATE")
+            where.append("f.departure_date_time < DATE_ADD(CURRENT_DATE, INTERVAL 30 DAY)")
+
+    if from_ap:
+        where.append("f.departure_airport = %s")
+        params.append(from_ap)
+
+    if to_ap:
+        where.append("f.arrival_airport = %s")
+        params.append(to_ap)
+
+    if from_city:
+        where.append("da.city LIKE %s")
+        params.append(f"%{from_city}%")
+
+    if to_city:
+        where.append("aa.city LIKE %s")
+        params.append(f"%{to_city}%")
+
+    sql = """
+    SELECT f.flight_number,
+           f.departure_date_time, f.arrival_date_time,
+           f.departure_airport,   f.arrival_airport,
+           f.status
+    FROM Flight f
+    JOIN Airport da ON da.code = f.departure_airport
+    JOIN Airport aa ON aa.code = f.arrival_airport
+    WHERE {where}
+    ORDER BY f.departure_date_time
+    """.format(where=" AND ".join(where))
+
+    return sql, params
+
+def build_trips_query(view: str, after: bool = False) -> str:
+    """One page of a customer's trips, upcoming (soonest first) or past (latest
+    first), with whether each flight has been reviewed. Filters and orders on
+    Ticket(customer_email, departure_date_time) in index order, so
+    idx_ticket_customer_dep serves the range scan without a filesort;
+    Flight and Review are PK lookups.
+    Keyset paging: with `after`, the page starts past the previous page's last
+    (departure_date_time, airline_name, flight_number, ticket_ID). MySQL won't
+    bound an index range with a row-constructor comparison, so the cursor's
+    departure_date_time is also compared on its own: the range scan starts at
+    the cursor, and the tuple only filters rows sharing that departure time.
+    Params: (customer_email, [departure_date_time, then the 4 key columns if
+    after], limit)."""
+    if view == "past":
+        cond, order, cmp = "t.departure_date_time < NOW()", "DESC", "<"
+    else:
+        cond, order, cmp = "t.departure_date_time >= NOW()", "ASC", ">"
+    if after:
+        cond += (
+            " AND t.departure_date_time {}= %s"
+            " AND (t.departure_date_time, t.airline_name, t.flight_number, t.ticket_ID)"
+            " {} (%s, %s, %s, %s)".format(cmp, cmp)
+        )
+    return """
+    SELECT t.ticket_ID, f.airline_name, f.flight_number, f.departure_date_time,
+           f.arrival_date_time, f.departure_airport, f.arrival_airport, f.status,
+           r.rating, (r.customer_email IS NOT NULL) AS reviewed
+    FROM Ticket t
+    JOIN Flight f
+      ON f.airline_name=t.airline_name AND f.flight_number=t.flight_number AND f.departure_date_time=t.departure_date_time
+    LEFT JOIN Review r
+      ON r.customer_email=t.customer_email AND r.airline_name=t.airline_name
+     AND r.flight_number=t.flight_number AND r.departure_date_time=t.departure_date_time
+    WHERE t.customer_email=%s AND {cond}
+    ORDER BY t.departure_date_time {order}, t.airline_name {order},
+             t.flight_number {order}, t.ticket_ID {order}
+    LIMIT %s
+    """.format(cond=cond, order=order)
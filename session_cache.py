@@ -0,0 +1,82 @@
+import os, threading, time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# Per-customer cache for dashboard/trip pages. Entries live for one login
+# session at most: app.py invalidates a customer's entries on login, logout,
+# purchase and review changes. The TTL bounds staleness when a flight moves
+# from upcoming to past while nobody writes.
+#
+# Memory is bounded: callers only cache a fixed set of keys per customer (the
+# first page of each view), expired entries are purged on put, and at most
+# max_customers customers are kept (least recently used evicted first).
+
+class CustomerCache:
+    def __init__(self, ttl: float, max_customers: int):
+        self.ttl = ttl
+        self.max_customers = max(1, max_customers)
+        self.lock = threading.Lock()
+        # email -> {"gen": int, "entries": {key: (expires, value)}}
+        self.customers: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.clock = 0
+        self.evicted_gen = 0
+
+    def token(self) -> int:
+        """Take before reading the database; pass to put(). A put whose
+        customer was invalidated after the token was taken is dropped, so a
+        slow read can't write back a page that predates a purchase/review."""
+        with self.lock:
+            return self.clock
+
+    def get(self, email: str, key: Hashable) -> Optional[Any]:
+        with self.lock:
+            rec = self.customers.get(email)
+            hit = rec["entries"].get(key) if rec else None
+            if hit is None:
+                return None
+            expires, value = hit
+            if expires < time.monotonic():
+                del rec["entries"][key]
+                return None
+            self.customers.move_to_end(email)
+            return value
+
+    def put(self, email: str, key: Hashable, value: Any, token: int) -> bool:
+        with self.lock:
+            rec = self.customers.get(email)
+            # evicted customers may have been invalidated after `token`
+            gen = rec["gen"] if rec else self.evicted_gen
+            if gen > token:
+                return False
+            if rec is None:
+                rec = self.customers[email] = {"gen": 0, "entries": {}}
+            now = time.monotonic()
+            entries = rec["entries"]
+            for k in [k for k, (expires, _) in entries.items() if expires < now]:
+                del entries[k]
+            entries[key] = (now + self.ttl, value)
+            self.customers.move_to_end(email)
+            self._trim()
+            return True
+
+    def invalidate(self, email: str):
+        with self.lock:
+            self.clock += 1
+            rec = self.customers.get(email)
+            if rec is None:
+                rec = self.customers[email] = {"gen": 0, "entries": {}}
+            rec["gen"] = self.clock
+            rec["entries"].clear()
+            self.customers.move_to_end(email)
+            self._trim()
+
+    def _trim(self):
+        while len(self.customers) > self.max_customers:
+            _, rec = self.customers.popitem(last=False)
+            self.evicted_gen = max(self.evicted_gen, rec["gen"])
+
+
+trip_cache = CustomerCache(
+    ttl=float(os.getenv("CUSTOMER_CACHE_TTL", "60")),
+    max_customers=int(os.getenv("CUSTOMER_CACHE_MAX", "10000")),
+)
@@ -0,0 +1,11 @@
+-- For databases created before idx_ticket_customer_dep was added to create_table.sql.
+-- Covers the per-customer trip pages (customer_email, departure_date_time range + order);
+-- InnoDB secondary indexes carry the ticket_ID primary key.
+CREATE INDEX idx_ticket_customer_dep
+    ON Ticket (customer_email, departure_date_time, airline_name, flight_number);
+
+-- The FOREIGN KEY (customer_email) index InnoDB created automatically is now redundant:
+-- idx_ticket_customer_dep starts with customer_email and can back the FK, and keeping both
+-- means every ticket insert maintains two indexes. Find its name (usually `customer_email`)
+-- with SHOW INDEX FROM Ticket, then drop it, e.g.:
+-- ALTER TABLE Ticket DROP INDEX customer_email;
@@ -80,6 +80,7 @@ CREATE TABLE Ticket (
     name_on_card VARCHAR(100),
     expiration_date DATE,
     purchase_date_time TIMESTAMP,
+    INDEX idx_ticket_customer_dep (customer_email, departure_date_time, airline_name, flight_number),
     FOREIGN KEY (customer_email) REFERENCES Customer(email),
     FOREIGN KEY (airline_name, flight_number, departure_date_time) REFERENCES Flight(airline_name, flight_number, departure_date_time)
 );
@@ -0,0 +1,57 @@
+import importlib, os, sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=()):
+        self.conn.executed.append((sql, tuple(params)))
+
+    def fetchall(self):
+        return self.conn.results.pop(0) if self.conn.results else []
+
+    def fetchone(self):
+        rows = self.fetchall()
+        return rows[0] if rows else None
+
+
+class FakeConn:
+    """Stands in for app.conn: records executed SQL, returns queued result sets."""
+
+    def __init__(self):
+        self.executed = []
+        self.results = []
+        self.commits = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    """Import app.py against a FakeConn (it connects at import time), with
+    fresh admission gates and an empty trip cache."""
+    pytest.importorskip("flask")
+    pymysql = pytest.importorskip("pymysql")
+    monkeypatch.setattr(pymysql, "connect", lambda **kw: FakeConn())
+    sys.modules.pop("app", None)
+    module = importlib.import_module("app")
+    import admission, session_cache
+    monkeypatch.setattr(admission, "gates", admission.load_gates())
+    session_cache.trip_cache.customers.clear()
+    module.app.config["TESTING"] = True
+    yield module
+    sys.modules.pop("app", None)
@@ -0,0 +1,100 @@
+import threading, time
+import pytest
+
+from admission import Gate, Overloaded
+
+
+def hold(gate, release):
+    """Occupy one slot in `gate` from a background thread until `release` is set."""
+    entered = threading.Event()
+
+    def run():
+        gate.acquire()
+        entered.set()
+        release.wait()
+        gate.release()
+
+    t = threading.Thread(target=run)
+    t.start()
+    assert entered.wait(1)
+    return t
+
+
+def wait_for_queue(gate, depth):
+    deadline = time.monotonic() + 1
+    while gate.waiting < depth and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert gate.waiting == depth
+
+
+def test_admit_within_limit():
+    gate = Gate("search", limit=2, queue=0, wait=0.1, retry_after=2)
+    gate.acquire()
+    gate.acquire()
+    assert gate.stats()["active"] == 2
+    gate.release()
+    gate.release()
+    assert gate.stats()["active"] == 0
+    assert gate.stats()["admitted"] == 2
+
+
+def test_reject_when_queue_full():
+    gate = Gate("staff-analytics", limit=1, queue=0, wait=1.0, retry_after=30)
+    gate.acquire()
+    with pytest.raises(Overloaded) as e:
+        gate.acquire()
+    assert e.value.retry_after == 30
+    assert gate.stats()["rejected"] == 1
+    gate.release()
+
+
+def test_queued_request_admitted_on_release():
+    gate = Gate("admin", limit=1, queue=1, wait=1.0, retry_after=5)
+    release = threading.Event()
+    t = hold(gate, release)
+    done = []
+    waiter = threading.Thread(target=lambda: (gate.acquire(), done.append(1), gate.release()))
+    waiter.start()
+    wait_for_queue(gate, 1)
+    release.set()
+    t.join()
+    waiter.join()
+    assert done == [1]
+    assert gate.stats()["admitted"] == 2
+
+
+def test_timeout_while_queued():
+    gate = Gate("admin", limit=1, queue=1, wait=0.05, retry_after=5)
+    release = threading.Event()
+    t = hold(gate, release)
+    with pytest.raises(Overloaded):
+        gate.acquire()
+    assert gate.stats()["timed_out"] == 1
+    assert gate.stats()["queue_depth"] == 0
+    release.set()
+    t.join()
+
+
+def test_shed_while_purchases_queue():
+    purchase = Gate("purchase", limit=1, queue=4, wait=1.0, retry_after=1)
+    analytics = Gate("staff-analytics", limit=2, queue=2, wait=0.5, retry_after=30, yield_at=1)
+    search = Gate("search", limit=2, queue=2, wait=0.5, retry_after=2, yield_at=0)
+    release = threading.Event()
+    t = hold(purchase, release)
+    waiter = threading.Thread(target=lambda: (purchase.acquire(), purchase.release()))
+    waiter.start()
+    wait_for_queue(purchase, 1)
+
+    with pytest.raises(Overloaded):
+        analytics.acquire(yield_to=purchase)
+    assert analytics.stats()["shed"] == 1
+
+    # search never yields by default: customers reach purchases through it
+    search.acquire(yield_to=purchase)
+    search.release()
+
+    release.set()
+    t.join()
+    waiter.join()
+    analytics.acquire(yield_to=purchase)
+    analytics.release()
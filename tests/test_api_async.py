@@ -0,0 +1,133 @@
+import asyncio
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("aiomysql")
+
+from aiohttp.test_utils import TestClient, TestServer
+import api_async
+
+
+class StubCursor:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql, params):
+        self.pool.executed.append((sql, params))
+        self.sql = sql
+
+    async def fetchall(self):
+        return [dict(r) for r in self.pool.rows(self.sql)]
+
+
+class StubConn:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def cursor(self):
+        return StubCursor(self.pool)
+
+
+class StubPool:
+    """Just enough of aiomysql.Pool: acquire()/release() and DictCursor rows."""
+
+    def __init__(self, rows=None, hang=False):
+        self.executed = []
+        self.released = 0
+        self.rows = rows or (lambda sql: [])
+        self.hang = hang
+
+    async def acquire(self):
+        if self.hang:
+            await asyncio.sleep(3600)
+        return StubConn(self)
+
+    def release(self, conn):
+        self.released += 1
+
+
+def run(pool, method, path, check):
+    async def go():
+        async with TestClient(TestServer(api_async.create_app(pool))) as client:
+            resp = await client.request(method, path)
+            await check(resp)
+    asyncio.run(go())
+
+
+def test_split_dates_commas_repeats_and_dedup():
+    assert api_async.split_dates(["2025-01-01,2025-01-02", " 2025-01-01 ", "", "2025-01-03"]) == [
+        "2025-01-01", "2025-01-02", "2025-01-03",
+    ]
+
+
+def test_search_fans_out_one_query_per_date():
+    pool = StubPool()
+
+    async def check(resp):
+        assert resp.status == 200
+        body = await resp.json()
+        assert list(body["by_date"]) == ["2025-01-01", "2025-01-02"]
+
+    run(pool, "GET", "/api/flights/search?depart=jfk&date=2025-01-01,2025-01-02&date=2025-01-01", check)
+    assert [p for _, p in pool.executed] == [("JFK", "2025-01-01"), ("JFK", "2025-01-02")]
+    assert pool.released == 2
+
+
+def test_search_too_many_dates_400():
+    pool = StubPool()
+    dates = ",".join(f"2025-01-{d:02d}" for d in range(1, api_async.MAX_DATES + 2))
+
+    async def check(resp):
+        assert resp.status == 400
+
+    run(pool, "GET", "/api/flights/search?date=" + dates, check)
+    assert pool.executed == []
+
+
+def test_acquire_timeout_503(monkeypatch):
+    monkeypatch.setattr(api_async, "ACQUIRE_TIMEOUT", 0.01)
+
+    async def check(resp):
+        assert resp.status == 503
+        assert resp.headers["Retry-After"] == str(api_async.RETRY_AFTER)
+
+    run(StubPool(hang=True), "GET", "/api/flights/search", check)
+
+
+def test_ratings_drop_reviewer_emails():
+    def rows(sql):
+        if "AVG(r.rating)" in sql:
+            return [{"flight_number": "B6 1", "avg_rating": 4.5, "cnt": 2}]
+        return [{"customer_email": "a@x.com", "rating": 5, "comment": "ok"}]
+
+    async def check(resp):
+        assert resp.status == 200
+        body = await resp.json()
+        assert body["comments"] == [{"rating": 5, "comment": "ok"}]
+        assert body["summary"][0]["cnt"] == 2
+
+    run(StubPool(rows), "GET", "/api/airlines/JetBlue/ratings", check)
+
+
+def test_analytics_slots_fail_fast(monkeypatch):
+    monkeypatch.setattr(api_async, "ANALYTICS_LIMIT", 0)
+
+    async def check(resp):
+        assert resp.status == 503
+        assert resp.headers["Retry-After"] == str(api_async.ANALYTICS_RETRY_AFTER)
+
+    pool = StubPool()
+    run(pool, "GET", "/api/airlines/JetBlue/flights?period=past", check)
+    assert pool.executed == []
+
+    # search/status don't use the analytics slots
+    async def ok(resp):
+        assert resp.status == 200
+
+    run(StubPool(), "GET", "/api/flights/search", ok)
@@ -0,0 +1,42 @@
+import admission
+
+
+def fill(gate_name):
+    gate = admission.gates[gate_name]
+    gate.active, gate.queue = gate.limit, 0
+    return gate
+
+
+def test_search_get_skips_admission(app_module):
+    gate = fill("search")
+    resp = app_module.app.test_client().get("/search")
+    assert resp.status_code == 200
+    assert gate.stats()["rejected"] == 0
+
+
+def test_search_post_sheds_when_full(app_module):
+    gate = fill("search")
+    resp = app_module.app.test_client().post("/search", data={"depart": "JFK"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == str(gate.retry_after)
+    assert gate.stats()["rejected"] == 1
+
+
+def test_anonymous_staff_request_takes_no_slot(app_module):
+    gate = admission.gates["staff-analytics"]
+    resp = app_module.app.test_client().get("/staff/reports")
+    assert resp.status_code == 302
+    assert "/login" in resp.headers["Location"]
+    assert gate.stats()["admitted"] == 0
+
+
+def test_admitted_view_holds_db_lock(app_module, monkeypatch):
+    seen = []
+    monkeypatch.setattr(app_module, "render_template",
+                        lambda *a, **kw: seen.append(app_module.db_lock.locked()) or "")
+    client = app_module.app.test_client()
+    with client.session_transaction() as sess:
+        sess.update({"role": "staff", "username": "u", "airline": "JetBlue"})
+    assert client.get("/staff/reports").status_code == 200
+    assert seen == [True]
+    assert not app_module.db_lock.locked()
@@ -0,0 +1,82 @@
+from session_cache import trip_cache
+
+EMAIL = "a@x.com"
+CURSOR = ("2025-01-01 10:00:00", "JetBlue", "B6 1", 7)
+
+
+def rows(n):
+    return [{"ticket_ID": i, "departure_date_time": "2025-01-01 10:00:00",
+             "airline_name": "JetBlue", "flight_number": "B6 1"} for i in range(n)]
+
+
+def test_trips_cursor_parses_and_validates(app_module):
+    cursor = app_module.trips_cursor
+    full = {"after_dt": CURSOR[0], "after_airline": CURSOR[1], "after_flight": CURSOR[2], "after_ticket": "7"}
+    assert cursor(full) == CURSOR
+    assert cursor({}) is None
+    assert cursor({**full, "after_flight": " "}) is None
+    assert cursor({**full, "after_ticket": "7x"}) is None
+    assert cursor({k: v for k, v in full.items() if k != "after_dt"}) is None
+
+
+def test_first_page_cached_and_has_more(app_module):
+    conn = app_module.conn
+    per_page = app_module.TRIPS_PER_PAGE
+    conn.results = [rows(per_page + 1)]
+    page, has_more = app_module.customer_trips(EMAIL, "upcoming")
+    assert len(page) == per_page and has_more
+    sql, params = conn.executed[0]
+    assert params == (EMAIL, per_page + 1)
+    assert sql.count("%s") == len(params)
+
+    # second load is served from the cache
+    assert app_module.customer_trips(EMAIL, "upcoming") == (page, True)
+    assert len(conn.executed) == 1
+
+
+def test_last_page_has_no_more(app_module):
+    app_module.conn.results = [rows(3)]
+    page, has_more = app_module.customer_trips(EMAIL, "past")
+    assert len(page) == 3 and not has_more
+
+
+def test_deeper_pages_skip_cache(app_module):
+    conn = app_module.conn
+    per_page = app_module.TRIPS_PER_PAGE
+    conn.results = [rows(2), rows(2)]
+    app_module.customer_trips(EMAIL, "past", CURSOR)
+    app_module.customer_trips(EMAIL, "past", CURSOR)
+    assert len(conn.executed) == 2
+    sql, params = conn.executed[0]
+    assert params == (EMAIL, CURSOR[0]) + CURSOR + (per_page + 1,)
+    assert sql.count("%s") == len(params)
+    assert trip_cache.get(EMAIL, "past") is None
+
+
+def test_read_racing_invalidate_not_cached(app_module, monkeypatch):
+    conn = app_module.conn
+    fetch = type(conn.cursor()).fetchall
+
+    def fetch_then_purchase(cur):
+        result = fetch(cur)
+        trip_cache.invalidate(EMAIL)  # purchase commits while the read is in flight
+        return result
+
+    monkeypatch.setattr(type(conn.cursor()), "fetchall", fetch_then_purchase)
+    conn.results = [rows(1)]
+    app_module.customer_trips(EMAIL, "upcoming")
+    assert trip_cache.get(EMAIL, "upcoming") is None
+
+
+def test_trips_page_renders_next_cursor(app_module):
+    per_page = app_module.TRIPS_PER_PAGE
+    app_module.conn.results = [[
+        {**r, "arrival_date_time": "", "departure_airport": "JFK", "arrival_airport": "PVG",
+         "status": "ON_TIME", "rating": None, "reviewed": 0}
+        for r in rows(per_page + 1)
+    ]]
+    client = app_module.app.test_client()
+    with client.session_transaction() as sess:
+        sess.update({"role": "customer", "email": EMAIL, "display": "A"})
+    html = client.get("/customer/trips?view=upcoming").get_data(as_text=True)
+    assert "after_ticket=%d" % (per_page - 1) in html
@@ -0,0 +1,17 @@
+from queries import build_trips_query
+
+
+def test_trips_keyset_bounds_leading_column():
+    up = build_trips_query("upcoming", after=True)
+    past = build_trips_query("past", after=True)
+    # the standalone bound is what lets MySQL start the index range at the cursor
+    assert "AND t.departure_date_time >= %s AND (t.departure_date_time," in up
+    assert "AND t.departure_date_time <= %s AND (t.departure_date_time," in past
+    assert ") > (%s, %s, %s, %s)" in up
+    assert ") < (%s, %s, %s, %s)" in past
+
+
+def test_trips_order_matches_index():
+    past = build_trips_query("past")
+    assert ("ORDER BY t.departure_date_time DESC, t.airline_name DESC,\n"
+            "             t.flight_number DESC, t.ticket_ID DESC") in past
@@ -0,0 +1,44 @@
+import time
+
+from session_cache import CustomerCache
+
+
+def test_put_get_invalidate():
+    cache = CustomerCache(ttl=60, max_customers=10)
+    assert cache.put("a@x.com", "upcoming", ([1], False), cache.token())
+    assert cache.get("a@x.com", "upcoming") == ([1], False)
+    cache.invalidate("a@x.com")
+    assert cache.get("a@x.com", "upcoming") is None
+
+
+def test_expired_entries_purged_on_put():
+    cache = CustomerCache(ttl=0.01, max_customers=10)
+    cache.put("a@x.com", "upcoming", [], cache.token())
+    time.sleep(0.02)
+    cache.put("a@x.com", "past", [], cache.token())
+    assert list(cache.customers["a@x.com"]["entries"]) == ["past"]
+
+
+def test_customers_bounded_lru():
+    cache = CustomerCache(ttl=60, max_customers=3)
+    for i in range(100):
+        cache.put(f"c{i}@x.com", "upcoming", [], cache.token())
+    assert list(cache.customers) == ["c97@x.com", "c98@x.com", "c99@x.com"]
+
+
+def test_stale_put_after_invalidate_dropped():
+    cache = CustomerCache(ttl=60, max_customers=10)
+    token = cache.token()          # read starts
+    cache.invalidate("a@x.com")    # purchase commits meanwhile
+    assert not cache.put("a@x.com", "upcoming", ["stale"], token)
+    assert cache.get("a@x.com", "upcoming") is None
+    assert cache.put("a@x.com", "upcoming", ["fresh"], cache.token())
+
+
+def test_stale_put_dropped_after_eviction():
+    cache = CustomerCache(ttl=60, max_customers=1)
+    token = cache.token()
+    cache.invalidate("a@x.com")
+    cache.invalidate("b@x.com")    # evicts a@x.com's record
+    assert "a@x.com" not in cache.customers
+    assert not cache.put("a@x.com", "upcoming", ["stale"], token)